@@ -1,11 +1,27 @@
 import networkx as nx
+import numpy as np
 import random
 import string
 import json
 import os
 from datetime import datetime
 import uuid
-from collections import defaultdict
+import pickle
+import hashlib
+import tempfile
+from collections import Counter, defaultdict
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+_DATA_TYPES = (
+    "INTEGER", "BIGINT", "FLOAT", "DOUBLE", "DECIMAL(10,2)",
+    "VARCHAR(255)", "STRING", "TEXT", "CHAR(10)",
+    "TIMESTAMP", "DATE", "DATETIME", "BOOLEAN"
+)
+
+# Bump when the cached pickle's layout changes; the cache key also covers this
+# module's source, so any change to the generator invalidates old entries
+_CACHE_FORMAT = 1
 
 class LineageGraphGenerator:
     def __init__(self, 
@@ -14,18 +30,46 @@ class LineageGraphGenerator:
                  num_teams=10, 
                  output_dir="output",
                  orphaned_node_percent=0.1,
-                 disconnected_subgraphs=3):
+                 disconnected_subgraphs=3,
+                 seed=None,
+                 cache_dir=None):
         self.min_nodes = min_nodes
         self.edge_multiplier = edge_multiplier
         self.num_teams = num_teams
         self.output_dir = output_dir
         self.orphaned_node_percent = orphaned_node_percent  # Percentage of nodes to be orphaned
         self.disconnected_subgraphs = disconnected_subgraphs  # Number of disconnected subgraphs to create
+        self.seed = seed  # Makes generation reproducible when set
+        self.cache_dir = cache_dir  # Where seeded graphs are cached between runs
+        if seed is not None:
+            random.seed(seed)
         self.G = nx.DiGraph()
+        self.rng = np.random.default_rng(seed)
+        # Pools of pre-generated random names, refilled in batches
+        self._alphabet = np.frombuffer((string.ascii_lowercase + string.digits).encode(), dtype=np.uint8)
+        self._name_pools = {}
+        self._field_name_pool = []
+        # Uniform floats drawn in bulk and consumed by _rand_index
+        self._unit_pool = []
         self.teams = []
         self.data_sources = []
         self.asset_types = []
         self.relationship_types = []
+        # Lookup indexes maintained as nodes are created, so generation never
+        # has to scan the whole graph to find related assets
+        self._tables_by_schema = defaultdict(list)
+        self._columns_by_table = defaultdict(list)  # Keyed by any column parent: table, view, source or model
+        self._nodes_by_team_type = defaultdict(list)
+        # Creation timestamp shared by all nodes of a generation pass
+        self._now_iso = None
+        # Node type by node id, so edge validation doesn't go through NetworkX
+        self._node_type = {}
+        # Column data type by node id, so derived columns can copy it without a graph lookup
+        self._column_data_type = {}
+        # Nodes and edges waiting to be added to the graph in one batch. All
+        # generation goes through these; reading self.G adds them first.
+        self._pending_nodes = []
+        self._pending_edges = []
         self._setup_metadata()
         self._setup_valid_relationships()
         self._setup_data_source_restrictions()
@@ -89,6 +133,11 @@ class LineageGraphGenerator:
             {"id": "transforms", "name": "Transforms"},
             {"id": "enriches", "name": "Enriches"}
         ]
+        
+        # Field names are a prefix with an optional suffix
+        prefixes = ["id", "name", "value", "count", "date", "timestamp", "amount", "price", "quantity", "status"]
+        suffixes = ["", "_id", "_name", "_value", "_count", "_date", "_ts", "_amt", "_price", "_qty", "_status"]
+        self._field_names = np.array([f"{prefix}{suffix}" for prefix in prefixes for suffix in suffixes], dtype=object)
     
     def _setup_data_source_restrictions(self):
         """Define which asset types are valid for each data source"""
@@ -121,6 +170,9 @@ class LineageGraphGenerator:
             "s3": ["bucket"]
         }
         
+        # Set views of the above for membership checks
+        self._ds_asset_type_sets = {ds: frozenset(asset_types) for ds, asset_types in self.data_source_asset_types.items()}
+        
         # Reverse mapping: asset type to valid data sources
         self.asset_type_data_sources = defaultdict(list)
         for ds, asset_types in self.data_source_asset_types.items():
@@ -129,7 +181,7 @@ class LineageGraphGenerator:
     
     def is_valid_asset_for_data_source(self, asset_type, data_source):
         """Check if the asset type is valid for the given data source"""
-        return asset_type in self.data_source_asset_types.get(data_source, [])
+        return asset_type in self._ds_asset_type_sets.get(data_source, ())
     
     def get_valid_asset_types_for_data_source(self, data_source):
         """Get valid asset types for the given data source"""
@@ -195,119 +247,155 @@ class LineageGraphGenerator:
             ("source", "model"): ["source_to_target"],
             ("table", "source"): ["source_to_target"]
         }
+        
+        # Frozen copies used on the per-edge lookup path: tuples to pick a
+        # relationship from, triples for O(1) membership checks
+        self._valid_rels_tuple = {pair: tuple(rels) for pair, rels in self._valid_relationships.items()}
+        self._valid_rel_triples = frozenset((src, tgt, rel) for (src, tgt), rels in self._valid_relationships.items()
+                                            for rel in rels)
+        self._has_wildcards = any("*" in pair for pair in self._valid_relationships)
     
     def is_valid_relationship(self, source_type, target_type, relationship_type):
         """Check if the relationship between source and target types is valid"""
         # Check direct relationship
-        if (source_type, target_type) in self._valid_relationships:
-            return relationship_type in self._valid_relationships[(source_type, target_type)]
+        if (source_type, target_type, relationship_type) in self._valid_rel_triples:
+            return True
+        
+        if not self._has_wildcards or (source_type, target_type) in self._valid_rels_tuple:
+            return False
         
         # Check for any wildcard relationships
-        if (source_type, "*") in self._valid_relationships:
-            return relationship_type in self._valid_relationships[(source_type, "*")]
+        if (source_type, "*") in self._valid_rels_tuple:
+            return (source_type, "*", relationship_type) in self._valid_rel_triples
         
-        if ("*", target_type) in self._valid_relationships:
-            return relationship_type in self._valid_relationships[("*", target_type)]
+        if ("*", target_type) in self._valid_rels_tuple:
+            return ("*", target_type, relationship_type) in self._valid_rel_triples
         
         # Default: relationship not defined, so not valid
         return False
     
     def get_valid_relationships(self, source_type, target_type):
         """Get valid relationship types between source and target asset types"""
-        if (source_type, target_type) in self._valid_relationships:
-            return self._valid_relationships[(source_type, target_type)]
-        return []
+        return self._valid_rels_tuple.get((source_type, target_type), ())
     
-    def add_edge_with_validation(self, source_id, target_id, relationship=None):
-        """Add an edge with validation of relationship types"""
+    def _validate_edge(self, source_id, target_id, relationship=None):
+        """Return the relationship to use for an edge, or None if it isn't valid"""
         # Get node types
-        if source_id not in self.G.nodes() or target_id not in self.G.nodes():
-            return False
-            
-        source_type = self.G.nodes[source_id].get("type", "unknown")
-        target_type = self.G.nodes[target_id].get("type", "unknown")
+        source_type = self._node_type.get(source_id)
+        target_type = self._node_type.get(target_id)
+        if source_type is None or target_type is None:
+            return None
         
         # If relationship type not specified, pick a valid one
         if not relationship:
             valid_rels = self.get_valid_relationships(source_type, target_type)
             if not valid_rels:
-                return False
-            relationship = random.choice(valid_rels)
+                return None
+            # Picked from the allowed list, so it's valid by construction
+            return valid_rels[self._rand_index(len(valid_rels))]
         
         # Validate relationship
         if self.is_valid_relationship(source_type, target_type, relationship):
-            self.G.add_edge(source_id, target_id, relationship=relationship)
-            return True
+            return relationship
         
-        return False
+        return None
+    
+    def _add_node(self, node_id, column_of=None, **attrs):
+        """Queue a node with flat attributes for the next batched insert and record its type"""
+        # Only index new nodes: a column name can repeat within its parent, and
+        # re-adding the node just updates it in the graph
+        if node_id not in self._node_type:
+            if "team" in attrs:
+                self._nodes_by_team_type[(attrs["team"], attrs["type"])].append(node_id)
+            if column_of is not None:
+                self._columns_by_table[column_of].append(node_id)
+        self._node_type[node_id] = attrs["type"]
+        if "data_type" in attrs:
+            self._column_data_type[node_id] = attrs["data_type"]
+        self._pending_nodes.append((node_id, attrs))
+    
+    def _get_team_nodes(self, team_id, *types):
+        """Get the ids of a team's nodes of the given types"""
+        if len(types) == 1:
+            return list(self._nodes_by_team_type.get((team_id, types[0]), ()))
+        return [n for t in types for n in self._nodes_by_team_type.get((team_id, t), ())]
+    
+    def _add_edge(self, source_id, target_id, **attrs):
+        """Queue an edge for the next batched insert"""
+        self._pending_edges.append((source_id, target_id, attrs))
+    
+    def add_edge_with_validation(self, source_id, target_id, relationship=None):
+        """Add an edge with validation of relationship types"""
+        relationship = self._validate_edge(source_id, target_id, relationship)
+        if relationship is None:
+            return False
+        
+        self._pending_edges.append((source_id, target_id, {"relationship": relationship}))
+        return True
+    
+    @property
+    def G(self):
+        """The lineage graph, including any nodes and edges still queued"""
+        if self._pending_nodes or self._pending_edges:
+            self._flush_pending()
+        return self._graph
+    
+    @G.setter
+    def G(self, graph):
+        self._graph = graph
+    
+    def _flush_pending(self):
+        """Add all queued nodes and edges to the graph in one batch"""
+        if self._pending_nodes:
+            self._graph.add_nodes_from(self._pending_nodes)
+            self._pending_nodes.clear()
+        if self._pending_edges:
+            self._graph.add_edges_from(self._pending_edges)
+            self._pending_edges.clear()
+    
+    def _refill_name_pool(self, length, size=8192):
+        """Generate a batch of random name suffixes of the given length"""
+        chars = self._alphabet[self.rng.integers(0, len(self._alphabet), size=(size, length))]
+        self._name_pools[length] = chars.view(f"S{length}").ravel().astype(str).tolist()
+        return self._name_pools[length]
     
     def _generate_random_name(self, prefix, length=8):
         """Generate a random name with the given prefix"""
-        suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-        return f"{prefix}_{suffix}"
+        pool = self._name_pools.get(length) or self._refill_name_pool(length)
+        return f"{prefix}_{pool.pop()}"
     
-    def _generate_random_field_name(self):
-        """Generate a random field name"""
-        prefixes = ["id", "name", "value", "count", "date", "timestamp", "amount", "price", "quantity", "status"]
-        suffixes = ["", "_id", "_name", "_value", "_count", "_date", "_ts", "_amt", "_price", "_qty", "_status"]
-        
-        prefix = random.choice(prefixes)
-        suffix = random.choice(suffixes)
-        
-        if suffix == "":
-            return prefix
-        else:
-            return f"{prefix}{suffix}"
+    def _generate_random_field_names(self, count):
+        """Generate a batch of random field names"""
+        pool = self._field_name_pool
+        if len(pool) < count:
+            pool.extend(self._field_names[self.rng.integers(0, len(self._field_names), max(count, 8192))].tolist())
+        names = pool[-count:] if count else []
+        del pool[len(pool) - count:]
+        return names
     
-    def _get_random_data_type(self):
-        """Get a random data type for a field"""
-        data_types = [
-            "INTEGER", "BIGINT", "FLOAT", "DOUBLE", "DECIMAL(10,2)", 
-            "VARCHAR(255)", "STRING", "TEXT", "CHAR(10)", 
-            "TIMESTAMP", "DATE", "DATETIME", "BOOLEAN"
-        ]
-        return random.choice(data_types)
+    def _rand_index(self, n):
+        """Get a random index in range(n) from a pre-drawn batch"""
+        if not self._unit_pool:
+            self._unit_pool = self.rng.random(65536).tolist()
+        return int(self._unit_pool.pop() * n)
+    
+    def _get_random_data_types(self, count):
+        """Get a batch of random data types for fields"""
+        return [_DATA_TYPES[i] for i in self.rng.integers(0, len(_DATA_TYPES), count).tolist()]
     
-    def generate_schema(self):
-        """Generate schema structure for each team and data source"""
-        schemas = {}
+    def _iter_databases(self, team_id):
+        """Yield (database name, schema names) pairs for one of a team's database data sources"""
+        # Generate 2-5 databases per team per data source
+        db_count = random.randint(2, 5)
         
-        for team in self.teams:
-            team_id = team["id"]
-            team_schemas = {}
+        for i in range(db_count):
+            db_name = self._generate_random_name(f"{team_id}_db", 6)
             
-            # Each team uses 3-5 data sources
-            team_data_sources = random.sample(self.data_sources, random.randint(3, min(5, len(self.data_sources))))
-            
-            for data_source in team_data_sources:
-                ds_id = data_source["id"]
-                
-                # Skip non-database data sources for schema generation
-                if data_source["type"] not in ["warehouse", "database"]:
-                    continue
-                
-                # Generate 2-5 databases per team per data source
-                db_count = random.randint(2, 5)
-                databases = []
-                
-                for i in range(db_count):
-                    db_name = self._generate_random_name(f"{team_id}_db", 6)
-                    
-                    # Generate 3-10 schemas per database
-                    schema_count = random.randint(3, 10)
-                    db_schemas = []
-                    
-                    for j in range(schema_count):
-                        schema_name = self._generate_random_name(f"{db_name}_schema", 6)
-                        db_schemas.append(schema_name)
-                    
-                    databases.append({"name": db_name, "schemas": db_schemas})
-                
-                team_schemas[ds_id] = databases
+            # Generate 3-10 schemas per database
+            schema_count = random.randint(3, 10)
+            schema_names = [self._generate_random_name(f"{db_name}_schema", 6) for j in range(schema_count)]
             
-            schemas[team_id] = team_schemas
-        
-        return schemas
+            yield db_name, schema_names
     
     def _assign_scores(self):
         """
@@ -317,40 +405,42 @@ class LineageGraphGenerator:
         - ~20% have light usage (scores between 1-39)
         - ~50% have no usage (score = -1)
         """
-        nodes = list(self.G.nodes())
-        # Shuffle to ensure randomness
-        random.shuffle(nodes)
+        graph = self.G
         
-        total_nodes = len(nodes)
+        total_nodes = graph.number_of_nodes()
         heavy_usage_count = int(total_nodes * 0.2)  # 20% heavy usage
         moderate_usage_count = int(total_nodes * 0.1)  # ~10% moderate usage
         light_usage_count = int(total_nodes * 0.2)  # ~20% light usage
         # The rest (~50%) will have no usage
-        
-        # Assign scores
-        for i, node in enumerate(nodes):
-            if i < heavy_usage_count:
-                # Heavy usage (70-100)
-                score = random.randint(70, 100)
-            elif i < (heavy_usage_count + moderate_usage_count):
-                # Moderate usage (40-69)
-                score = random.randint(40, 69)
-            elif i < (heavy_usage_count + moderate_usage_count + light_usage_count):
-                # Light usage (1-39)
-                score = random.randint(1, 39)
-            else:
-                # No usage (-1)
-                score = -1
-                
-            # Add the score to the node attributes
-            self.G.nodes[node]['score'] = score
+        no_usage_count = total_nodes - heavy_usage_count - moderate_usage_count - light_usage_count
+        
+        # Draw every score in one go, then shuffle so the buckets land on random nodes
+        scores = np.concatenate([
+            self.rng.integers(70, 101, heavy_usage_count),    # Heavy usage (70-100)
+            self.rng.integers(40, 70, moderate_usage_count),  # Moderate usage (40-69)
+            self.rng.integers(1, 40, light_usage_count),      # Light usage (1-39)
+            np.full(no_usage_count, -1)                       # No usage (-1)
+        ])
+        self.rng.shuffle(scores)
+        
+        # Add the scores to the node attributes
+        nx.set_node_attributes(graph, dict(zip(graph, scores.tolist())), "score")
     
     def generate_graph(self):
         """Generate the full lineage graph"""
+        # A seeded graph is fully determined by its parameters, so reuse a cached copy if there is one
+        cache_path = self._get_cache_path()
+        if cache_path and os.path.exists(cache_path):
+            print(f"Loading cached lineage graph from {cache_path}...")
+            with open(cache_path, "rb") as f:
+                self.G = pickle.load(f)
+            self._node_type = dict(self.G.nodes(data="type"))
+            return self.G
+        
         print(f"Generating lineage graph with minimum {self.min_nodes} nodes and approximately {self.min_nodes * self.edge_multiplier} edges...")
         
-        # Generate schemas for database-type data sources
-        schemas = self.generate_schema()
+        # Compute the creation timestamp once instead of once per node
+        self._now_iso = datetime.now().isoformat()
         
         # Track node counts per team for balanced distribution
         team_node_counts = {team["id"]: 0 for team in self.teams}
@@ -358,41 +448,21 @@ class LineageGraphGenerator:
         
         # Generate nodes for each team
         for team in self.teams:
-            team_id = team["id"]
-            print(f"Generating nodes for {team['name']}...")
-            
-            # Each team uses 3-5 data sources
-            team_data_sources = random.sample(self.data_sources, random.randint(3, min(5, len(self.data_sources))))
-            
-            for data_source in team_data_sources:
-                ds_id = data_source["id"]
-                ds_type = data_source["type"]
-                
-                if ds_type in ["warehouse", "database"]:
-                    self._generate_database_assets(team, data_source, schemas[team_id].get(ds_id, []), team_node_counts, nodes_per_team)
-                elif ds_type == "transformation":
-                    self._generate_dbt_assets(team, data_source, team_node_counts, nodes_per_team)
-                elif ds_type == "bi":
-                    self._generate_bi_assets(team, data_source, team_node_counts, nodes_per_team)
-                elif ds_type == "orchestration":
-                    self._generate_orchestration_assets(team, data_source, team_node_counts, nodes_per_team)
-                elif ds_type == "streaming":
-                    self._generate_streaming_assets(team, data_source, team_node_counts, nodes_per_team)
-                elif ds_type == "storage":
-                    self._generate_storage_assets(team, data_source, team_node_counts, nodes_per_team)
+            self._generate_team_assets(team, team_node_counts, nodes_per_team)
         
         # Generate cross-team lineage edges
         self._generate_cross_team_lineage()
         
-        # Ensure we have enough nodes
-        total_nodes = len(self.G.nodes())
+        # Ensure we have enough nodes (the type index holds one entry per node,
+        # so this doesn't need to flush the staged inserts)
+        total_nodes = len(self._node_type)
         if total_nodes < self.min_nodes:
             print(f"Only generated {total_nodes} nodes. Adding {self.min_nodes - total_nodes} more nodes...")
             self._add_additional_nodes(self.min_nodes - total_nodes)
         
         # Ensure we have enough edges
         target_edges = self.min_nodes * self.edge_multiplier
-        total_edges = len(self.G.edges())
+        total_edges = self.G.number_of_edges()
         if total_edges < target_edges:
             print(f"Only generated {total_edges} edges. Adding {target_edges - total_edges} more edges...")
             self._add_additional_edges(target_edges - total_edges)
@@ -405,26 +475,74 @@ class LineageGraphGenerator:
         self._assign_scores()
         
         # Print final counts
-        final_nodes = len(self.G.nodes())
-        final_edges = len(self.G.edges())
+        final_nodes = self.G.number_of_nodes()
+        final_edges = self.G.number_of_edges()
         print(f"Final graph has {final_nodes} nodes and {final_edges} edges")
         
         # Print connectivity stats
         connectivity_stats = self._analyze_connectivity()
         print(f"Graph connectivity: {connectivity_stats['connected_components']} connected components, {connectivity_stats['orphaned_nodes']} orphaned nodes")
         
+        if cache_path:
+            # Write to a temporary file and move it into place, so an interrupted
+            # run can't leave a truncated cache entry behind
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(self.G, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        
         return self.G
     
-    def _generate_database_assets(self, team, data_source, db_schemas, team_node_counts, nodes_per_team):
+    def _get_cache_path(self):
+        """Get the cache file for this generator's parameters, or None if caching is off"""
+        if self.seed is None or not self.cache_dir:
+            return None
+        
+        with open(__file__, "rb") as f:
+            source_digest = hashlib.sha256(f.read()).hexdigest()
+        params = (_CACHE_FORMAT, source_digest, self.min_nodes, self.edge_multiplier, self.num_teams,
+                  self.orphaned_node_percent, self.disconnected_subgraphs, self.seed)
+        key = hashlib.sha256(repr(params).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"lineage_graph_{key}.pkl")
+    
+    def _generate_team_assets(self, team, team_node_counts, nodes_per_team):
+        """Generate the assets of a single team across its data sources"""
+        print(f"Generating nodes for {team['name']}...")
+        
+        # Each team uses 3-5 data sources
+        team_data_sources = random.sample(self.data_sources, random.randint(3, min(5, len(self.data_sources))))
+        
+        for data_source in team_data_sources:
+            ds_type = data_source["type"]
+            
+            if ds_type in ["warehouse", "database"]:
+                self._generate_database_assets(team, data_source, team_node_counts, nodes_per_team)
+            elif ds_type == "transformation":
+                self._generate_dbt_assets(team, data_source, team_node_counts, nodes_per_team)
+            elif ds_type == "bi":
+                self._generate_bi_assets(team, data_source, team_node_counts, nodes_per_team)
+            elif ds_type == "orchestration":
+                self._generate_orchestration_assets(team, data_source, team_node_counts, nodes_per_team)
+            elif ds_type == "streaming":
+                self._generate_streaming_assets(team, data_source, team_node_counts, nodes_per_team)
+            elif ds_type == "storage":
+                self._generate_storage_assets(team, data_source, team_node_counts, nodes_per_team)
+    
+    def _generate_database_assets(self, team, data_source, team_node_counts, nodes_per_team):
         """Generate database assets (tables, views, columns)"""
         team_id = team["id"]
         ds_id = data_source["id"]
         
-        if not db_schemas or team_node_counts[team_id] >= nodes_per_team:
+        if team_node_counts[team_id] >= nodes_per_team:
             return
         
         # Ensure we're only creating valid asset types for this data source
-        valid_asset_types = self.get_valid_asset_types_for_data_source(ds_id)
+        valid_asset_types = self._ds_asset_type_sets.get(ds_id, frozenset())
         
         # Check if we can create tables and views for this data source
         can_create_tables = "table" in valid_asset_types
@@ -435,15 +553,24 @@ class LineageGraphGenerator:
         if not (can_create_tables or can_create_views):
             return
         
-        for database in db_schemas:
-            db_name = database["name"]
-            
-            for schema_name in database["schemas"]:
+        # Resolve the rules for the hot column edges once; both endpoint types
+        # are known when these edges are created, so they skip per-edge validation
+        col_col_rels = self.get_valid_relationships("column", "column")
+        table_col_ok = self.is_valid_relationship("table", "column", "parent_child")
+        view_col_ok = self.is_valid_relationship("view", "column", "parent_child")
+        
+        # Databases and schemas are drawn lazily as the loop reaches them
+        for db_name, schema_names in self._iter_databases(team_id):
+            for schema_name in schema_names:
+                # Build the schema key once; reusing the same string object lets
+                # CPython reuse its cached hash for every lookup below
+                schema_id = f"{ds_id}.{db_name}.{schema_name}"
+                schema_tables = self._tables_by_schema[schema_id]
+                
                 # Add schema node if allowed
                 if can_create_schemas:
-                    schema_id = f"{ds_id}.{db_name}.{schema_name}"
-                    if schema_id not in self.G:
-                        self.G.add_node(schema_id,
+                    if schema_id not in self._node_type:
+                        self._add_node(schema_id,
                                        id=schema_id,
                                        name=schema_name,
                                        full_name=f"{db_name}.{schema_name}",
@@ -451,7 +578,7 @@ class LineageGraphGenerator:
                                        data_source=ds_id,
                                        database=db_name,
                                        team=team_id,
-                                       created_at=datetime.now().isoformat())
+                                       created_at=self._now_iso)
                         team_node_counts[team_id] += 1
                 
                 # Generate tables if allowed
@@ -464,65 +591,77 @@ class LineageGraphGenerator:
                             return
                         
                         table_name = self._generate_random_name("tbl")
-                        table_id = f"{ds_id}.{db_name}.{schema_name}.{table_name}"
+                        table_full_name = f"{db_name}.{schema_name}.{table_name}"
+                        table_id = f"{ds_id}.{table_full_name}"
                         
                         # Add table node
-                        self.G.add_node(table_id, 
+                        self._add_node(table_id, 
                                         id=table_id,
                                         name=table_name,
-                                        full_name=f"{db_name}.{schema_name}.{table_name}",
+                                        full_name=table_full_name,
                                         type="table",
                                         data_source=ds_id,
                                         database=db_name,
                                         schema=schema_name,
                                         team=team_id,
-                                        created_at=datetime.now().isoformat())
+                                        created_at=self._now_iso)
                         team_node_counts[team_id] += 1
+                        schema_tables.append(table_id)
                         
                         # Connect table to schema if schema nodes exist
                         if can_create_schemas:
-                            schema_id = f"{ds_id}.{db_name}.{schema_name}"
-                            if schema_id in self.G:
-                                self.G.add_edge(schema_id, table_id, relationship="parent_child")
+                            if schema_id in self._node_type:
+                                self._add_edge(schema_id, table_id, relationship="parent_child")
                         
                         # Generate columns if allowed
                         if can_create_columns:
                             # Generate 5-50 columns per table
-                            column_count = random.randint(5, 50)
+                            column_count = 5 + self._rand_index(46)
                             
-                            for j in range(column_count):
-                                if team_node_counts[team_id] >= nodes_per_team:
-                                    return
-                                
-                                column_name = self._generate_random_field_name()
-                                column_id = f"{table_id}.{column_name}"
+                            # Bound the loop by the remaining node budget instead of
+                            # checking it for every column
+                            remaining = nodes_per_team - team_node_counts[team_id]
+                            
+                            # Column names only differ in the last part, so build the
+                            # shared prefixes once per table
+                            col_id_prefix = table_id + "."
+                            col_full_prefix = table_full_name + "."
+                            
+                            # Draw the names and data types for all of the table's columns at once
+                            column_names = self._generate_random_field_names(min(column_count, remaining))
+                            data_types = self._get_random_data_types(len(column_names))
+                            
+                            for column_name, data_type in zip(column_names, data_types):
+                                column_id = col_id_prefix + column_name
                                 
                                 # Add column node
-                                self.G.add_node(column_id,
+                                self._add_node(column_id,
                                                 id=column_id,
                                                 name=column_name,
-                                                full_name=f"{db_name}.{schema_name}.{table_name}.{column_name}",
+                                                full_name=col_full_prefix + column_name,
                                                 type="column",
-                                                data_type=self._get_random_data_type(),
+                                                data_type=data_type,
                                                 data_source=ds_id,
                                                 database=db_name,
                                                 schema=schema_name,
                                                 table=table_name,
                                                 team=team_id,
-                                                created_at=datetime.now().isoformat())
-                                team_node_counts[team_id] += 1
+                                                created_at=self._now_iso,
+                                                column_of=table_id)
                                 
                                 # Connect column to table
-                                self.add_edge_with_validation(table_id, column_id, "parent_child")
+                                if table_col_ok:
+                                    self._add_edge(table_id, column_id, relationship="parent_child")
+                            
+                            team_node_counts[team_id] += min(column_count, remaining)
+                            if column_count > remaining:
+                                return
                 
                 # Generate views if allowed
                 if can_create_views and can_create_tables:
                     # Generate some views that depend on the tables
                     view_count = random.randint(2, 10)
-                    tables_in_schema = [n for n in self.G.nodes() 
-                                      if self.G.nodes[n].get("type") == "table" and 
-                                         self.G.nodes[n].get("schema") == schema_name and
-                                         self.G.nodes[n].get("database") == db_name]
+                    tables_in_schema = schema_tables
                     
                     if tables_in_schema:
                         for i in range(view_count):
@@ -530,26 +669,28 @@ class LineageGraphGenerator:
                                 return
                             
                             view_name = self._generate_random_name("view")
-                            view_id = f"{ds_id}.{db_name}.{schema_name}.{view_name}"
+                            view_full_name = f"{db_name}.{schema_name}.{view_name}"
+                            view_id = f"{ds_id}.{view_full_name}"
+                            col_id_prefix = view_id + "."
+                            col_full_prefix = view_full_name + "."
                             
                             # Add view node
-                            self.G.add_node(view_id,
+                            self._add_node(view_id,
                                             id=view_id,
                                             name=view_name,
-                                            full_name=f"{db_name}.{schema_name}.{view_name}",
+                                            full_name=view_full_name,
                                             type="view",
                                             data_source=ds_id,
                                             database=db_name,
                                             schema=schema_name,
                                             team=team_id,
-                                            created_at=datetime.now().isoformat())
+                                            created_at=self._now_iso)
                             team_node_counts[team_id] += 1
                             
                             # Connect view to schema if schema nodes exist
                             if can_create_schemas:
-                                schema_id = f"{ds_id}.{db_name}.{schema_name}"
-                                if schema_id in self.G:
-                                    self.G.add_edge(schema_id, view_id, relationship="parent_child")
+                                if schema_id in self._node_type:
+                                    self._add_edge(schema_id, view_id, relationship="parent_child")
                             
                             # Connect view to source tables (1-5 source tables per view)
                             source_count = min(random.randint(1, 5), len(tables_in_schema))
@@ -560,43 +701,53 @@ class LineageGraphGenerator:
                                 
                                 # Also create field-level lineage for some columns
                                 if can_create_columns:
-                                    table_columns = [n for n in self.G.neighbors(table_id)]
+                                    table_columns = self._columns_by_table.get(table_id, ())
+                                    
+                                    view_column_count = 3 + self._rand_index(13)
+                                    
+                                    # Pre-draw up to 3 distinct source columns and a relationship
+                                    # for every view column in a single batch
+                                    source_col_count = min(3, len(table_columns)) if col_col_rels else 0
+                                    if source_col_count:
+                                        source_idx = self.rng.random((view_column_count, len(table_columns))).argsort(axis=1)[:, :source_col_count].tolist()
+                                        rel_idx = self.rng.integers(0, len(col_col_rels), (view_column_count, source_col_count)).tolist()
+                                    
+                                    remaining = nodes_per_team - team_node_counts[team_id]
                                     
                                     # Generate columns for the view
-                                    view_column_count = random.randint(3, 15)
-                                    for j in range(view_column_count):
-                                        if team_node_counts[team_id] >= nodes_per_team:
-                                            return
-                                        
-                                        view_col_name = self._generate_random_field_name()
-                                        view_col_id = f"{view_id}.{view_col_name}"
+                                    view_col_names = self._generate_random_field_names(min(view_column_count, remaining))
+                                    data_types = self._get_random_data_types(len(view_col_names))
+                                    
+                                    for j, (view_col_name, data_type) in enumerate(zip(view_col_names, data_types)):
+                                        view_col_id = col_id_prefix + view_col_name
                                         
                                         # Add view column node
-                                        self.G.add_node(view_col_id,
+                                        self._add_node(view_col_id,
                                                         id=view_col_id,
                                                         name=view_col_name,
-                                                        full_name=f"{db_name}.{schema_name}.{view_name}.{view_col_name}",
+                                                        full_name=col_full_prefix + view_col_name,
                                                         type="column",
-                                                        data_type=self._get_random_data_type(),
+                                                        data_type=data_type,
                                                         data_source=ds_id,
                                                         database=db_name,
                                                         schema=schema_name,
                                                         view=view_name,
                                                         team=team_id,
-                                                        created_at=datetime.now().isoformat())
-                                        team_node_counts[team_id] += 1
+                                                        created_at=self._now_iso,
+                                                        column_of=view_id)
                                         
                                         # Connect view column to view
-                                        self.add_edge_with_validation(view_id, view_col_id, "parent_child")
+                                        if view_col_ok:
+                                            self._add_edge(view_id, view_col_id, relationship="parent_child")
                                         
                                         # Connect to source columns
-                                        if table_columns:
-                                            source_columns = random.sample(table_columns, min(3, len(table_columns)))
-                                            for source_col_id in source_columns:
-                                                valid_rels = self.get_valid_relationships("column", "column")
-                                                if valid_rels:
-                                                    rel_type = random.choice(valid_rels)
-                                                    self.add_edge_with_validation(source_col_id, view_col_id, rel_type)
+                                        if source_col_count:
+                                            for col_idx, rel in zip(source_idx[j], rel_idx[j]):
+                                                self._add_edge(table_columns[col_idx], view_col_id, relationship=col_col_rels[rel])
+                                    
+                                    team_node_counts[team_id] += min(view_column_count, remaining)
+                                    if view_column_count > remaining:
+                                        return
 
     def _generate_dbt_assets(self, team, data_source, team_node_counts, nodes_per_team):
         """Generate dbt assets (sources, models)"""
@@ -607,7 +758,7 @@ class LineageGraphGenerator:
             return
         
         # Check if we can create models and sources for this data source
-        valid_asset_types = self.get_valid_asset_types_for_data_source(ds_id)
+        valid_asset_types = self._ds_asset_type_sets.get(ds_id, frozenset())
         
         can_create_models = "model" in valid_asset_types
         can_create_sources = "source" in valid_asset_types
@@ -619,16 +770,20 @@ class LineageGraphGenerator:
         # Generate 2-5 dbt projects per team
         project_count = random.randint(2, 5)
         
+        # Find potential source database tables (dbt doesn't add any, so this
+        # is the same for every project)
+        database_tables = self._get_team_nodes(team_id, "table")
+        
         for p in range(project_count):
-            project_name = f"{team_id}_dbt_project_{p+1}"
+            if team_node_counts[team_id] >= nodes_per_team:
+                return
             
-            # Find potential source database tables
-            database_tables = [n for n in self.G.nodes() 
-                              if self.G.nodes[n].get("type") == "table" and 
-                                 self.G.nodes[n].get("team") == team_id]
+            project_name = f"{team_id}_dbt_project_{p+1}"
             
-            sources = []
-            # Create sources for some database tables if allowed
+            # Create sources for some database tables if allowed. Each source is
+            # followed directly by its staging model, and both get their columns
+            # in the same pass over the table's columns.
+            stg_models = []
             if can_create_sources and database_tables:
                 source_tables = random.sample(database_tables, min(random.randint(5, 20), len(database_tables)))
                 
@@ -636,12 +791,13 @@ class LineageGraphGenerator:
                     if team_node_counts[team_id] >= nodes_per_team:
                         return
                     
-                    table_info = self.G.nodes[table_id]
-                    source_name = f"src_{table_info['name']}"
+                    # Generated names never contain dots, so the table name is the last part of its id
+                    table_name = table_id.rsplit(".", 1)[1]
+                    source_name = f"src_{table_name}"
                     source_id = f"{ds_id}.{project_name}.{source_name}"
                     
                     # Add source node
-                    self.G.add_node(source_id,
+                    self._add_node(source_id,
                                     id=source_id,
                                     name=source_name,
                                     full_name=f"{project_name}.{source_name}",
@@ -649,63 +805,23 @@ class LineageGraphGenerator:
                                     data_source=ds_id,
                                     project=project_name,
                                     team=team_id,
-                                    created_at=datetime.now().isoformat())
+                                    created_at=self._now_iso)
                     team_node_counts[team_id] += 1
                     
                     # Connect source to database table
-                    self.G.add_edge(table_id, source_id, relationship="source_to_target")
-                    sources.append(source_id)
+                    self._add_edge(table_id, source_id, relationship="source_to_target")
                     
-                    # Create field-level lineage if allowed
-                    if can_create_columns:
-                        table_columns = [n for n in self.G.neighbors(table_id)]
-                        
-                        for col_id in table_columns:
-                            if team_node_counts[team_id] >= nodes_per_team:
-                                return
-                            
-                            col_info = self.G.nodes[col_id]
-                            source_col_name = col_info['name']
-                            source_col_id = f"{source_id}.{source_col_name}"
-                            
-                            # Add source column node
-                            self.G.add_node(source_col_id,
-                                            id=source_col_id,
-                                            name=source_col_name,
-                                            full_name=f"{project_name}.{source_name}.{source_col_name}",
-                                            type="column",
-                                            data_type=col_info.get("data_type", "UNKNOWN"),
-                                            data_source=ds_id,
-                                            project=project_name,
-                                            source=source_name,
-                                            team=team_id,
-                                            created_at=datetime.now().isoformat())
-                            team_node_counts[team_id] += 1
-                            
-                            # Connect source column to source
-                            self.G.add_edge(source_id, source_col_id, relationship="parent_child")
-                            
-                            # Connect source column to database column
-                            self.G.add_edge(col_id, source_col_id, relationship="source_to_target")
-            
-            # Create models if allowed
-            if can_create_models:
-                # Generate different types of models (staging, intermediate, marts)
-                model_types = ["stg", "int", "mart"]
-                
-                # Create staging models based on sources
-                stg_models = []
-                if can_create_sources:
-                    for source_id in sources:
+                    # Create the staging model for this source if allowed
+                    model_id = None
+                    if can_create_models:
                         if team_node_counts[team_id] >= nodes_per_team:
                             return
                         
-                        source_info = self.G.nodes[source_id]
-                        model_name = f"stg_{source_info['name'].replace('src_', '')}"
+                        model_name = f"stg_{table_name}"
                         model_id = f"{ds_id}.{project_name}.{model_name}"
                         
                         # Add model node
-                        self.G.add_node(model_id,
+                        self._add_node(model_id,
                                         id=model_id,
                                         name=model_name,
                                         full_name=f"{project_name}.{model_name}",
@@ -714,44 +830,95 @@ class LineageGraphGenerator:
                                         data_source=ds_id,
                                         project=project_name,
                                         team=team_id,
-                                        created_at=datetime.now().isoformat())
+                                        created_at=self._now_iso)
                         team_node_counts[team_id] += 1
                         
                         # Connect model to source
-                        self.G.add_edge(source_id, model_id, relationship="source_to_target")
+                        self._add_edge(source_id, model_id, relationship="source_to_target")
                         stg_models.append(model_id)
+                    
+                    # Create field-level lineage if allowed
+                    if can_create_columns:
+                        table_columns = self._columns_by_table.get(table_id, ())
                         
-                        # Create field-level lineage if allowed
-                        if can_create_columns:
-                            source_columns = [n for n in self.G.neighbors(source_id) if self.G.nodes[n].get("type") == "column"]
+                        # Each table column yields a source column and, with a staging
+                        # model, a model column; bound the pass by the remaining budget.
+                        # An odd last slot still gets its source column, without the model column.
+                        remaining = nodes_per_team - team_node_counts[team_id]
+                        if model_id:
+                            column_count = min(len(table_columns), (remaining + 1) // 2)
+                            model_column_count = min(column_count, remaining - column_count)
+                        else:
+                            column_count = min(len(table_columns), remaining)
+                            model_column_count = 0
+                        
+                        # Column ids are "<parent id>.<column name>", and the data types are
+                        # indexed, so this loop never has to read the graph
+                        name_start = len(table_id) + 1
+                        
+                        # Build the shared id and full-name prefixes once per table
+                        source_col_prefix = source_id + "."
+                        source_full_prefix = f"{project_name}.{source_name}."
+                        if model_id:
+                            model_col_prefix = model_id + "."
+                            model_full_prefix = f"{project_name}.{model_name}."
+                        
+                        for i, col_id in enumerate(table_columns[:column_count]):
+                            col_name = col_id[name_start:]
+                            data_type = self._column_data_type.get(col_id, "UNKNOWN")
+                            source_col_id = source_col_prefix + col_name
                             
-                            for source_col_id in source_columns:
-                                if team_node_counts[team_id] >= nodes_per_team:
-                                    return
-                                
-                                source_col_info = self.G.nodes[source_col_id]
-                                model_col_name = source_col_info['name']
-                                model_col_id = f"{model_id}.{model_col_name}"
+                            # Add source column node
+                            self._add_node(source_col_id,
+                                            id=source_col_id,
+                                            name=col_name,
+                                            full_name=source_full_prefix + col_name,
+                                            type="column",
+                                            data_type=data_type,
+                                            data_source=ds_id,
+                                            project=project_name,
+                                            source=source_name,
+                                            team=team_id,
+                                            created_at=self._now_iso,
+                                            column_of=source_id)
+                            
+                            # Connect source column to source
+                            self._add_edge(source_id, source_col_id, relationship="parent_child")
+                            
+                            # Connect source column to database column
+                            self._add_edge(col_id, source_col_id, relationship="source_to_target")
+                            
+                            if i < model_column_count:
+                                model_col_id = model_col_prefix + col_name
                                 
                                 # Add model column node
-                                self.G.add_node(model_col_id,
+                                self._add_node(model_col_id,
                                                 id=model_col_id,
-                                                name=model_col_name,
-                                                full_name=f"{project_name}.{model_name}.{model_col_name}",
+                                                name=col_name,
+                                                full_name=model_full_prefix + col_name,
                                                 type="column",
-                                                data_type=source_col_info.get("data_type", "UNKNOWN"),
+                                                data_type=data_type,
                                                 data_source=ds_id,
                                                 project=project_name,
                                                 model=model_name,
                                                 team=team_id,
-                                                created_at=datetime.now().isoformat())
-                                team_node_counts[team_id] += 1
+                                                created_at=self._now_iso,
+                                                column_of=model_id)
                                 
                                 # Connect model column to model
-                                self.G.add_edge(model_id, model_col_id, relationship="parent_child")
+                                self._add_edge(model_id, model_col_id, relationship="parent_child")
                                 
                                 # Connect model column to source column
-                                self.G.add_edge(source_col_id, model_col_id, relationship="source_to_target")
+                                self._add_edge(source_col_id, model_col_id, relationship="source_to_target")
+                        
+                        team_node_counts[team_id] += column_count + model_column_count
+                        if team_node_counts[team_id] >= nodes_per_team:
+                            return
+            
+            # Create models if allowed
+            if can_create_models:
+                # Generate different types of models (staging, intermediate, marts)
+                model_types = ["stg", "int", "mart"]
                 
                 # If no staging models from sources, create some directly linked to tables
                 if not stg_models and database_tables:
@@ -759,12 +926,11 @@ class LineageGraphGenerator:
                         if team_node_counts[team_id] >= nodes_per_team:
                             return
                         
-                        table_info = self.G.nodes[table_id]
-                        model_name = f"stg_{table_info['name']}"
+                        model_name = f"stg_{table_id.rsplit('.', 1)[1]}"
                         model_id = f"{ds_id}.{project_name}.{model_name}"
                         
                         # Add model node
-                        self.G.add_node(model_id,
+                        self._add_node(model_id,
                                         id=model_id,
                                         name=model_name,
                                         full_name=f"{project_name}.{model_name}",
@@ -773,11 +939,11 @@ class LineageGraphGenerator:
                                         data_source=ds_id,
                                         project=project_name,
                                         team=team_id,
-                                        created_at=datetime.now().isoformat())
+                                        created_at=self._now_iso)
                         team_node_counts[team_id] += 1
                         
                         # Connect model to table
-                        self.G.add_edge(table_id, model_id, relationship="source_to_target")
+                        self._add_edge(table_id, model_id, relationship="source_to_target")
                         stg_models.append(model_id)
                 
                 # Rest of the model generation remains the same
@@ -787,16 +953,16 @@ class LineageGraphGenerator:
                 int_models = []
                 int_model_count = random.randint(5, 20)
                 
-                # Group staging models for intermediate models
+                # Group staging models for intermediate models by shuffling once
+                # and slicing off random-sized groups
                 stg_model_groups = []
-                remaining_stg = stg_models.copy()
+                random.shuffle(stg_models)  # Not used again after grouping
                 
-                while remaining_stg:
-                    group_size = min(random.randint(1, 3), len(remaining_stg))
-                    group = random.sample(remaining_stg, group_size)
-                    for m in group:
-                        remaining_stg.remove(m)
-                    stg_model_groups.append(group)
+                start = 0
+                while start < len(stg_models):
+                    group_size = min(random.randint(1, 3), len(stg_models) - start)
+                    stg_model_groups.append(stg_models[start:start + group_size])
+                    start += group_size
                 
                 for i, stg_group in enumerate(stg_model_groups):
                     if team_node_counts[team_id] >= nodes_per_team or i >= int_model_count:
@@ -806,7 +972,7 @@ class LineageGraphGenerator:
                     model_id = f"{ds_id}.{project_name}.{model_name}"
                     
                     # Add model node
-                    self.G.add_node(model_id,
+                    self._add_node(model_id,
                                     id=model_id,
                                     name=model_name,
                                     full_name=f"{project_name}.{model_name}",
@@ -815,50 +981,54 @@ class LineageGraphGenerator:
                                     data_source=ds_id,
                                     project=project_name,
                                     team=team_id,
-                                    created_at=datetime.now().isoformat())
+                                    created_at=self._now_iso)
                     team_node_counts[team_id] += 1
                     
                     # Connect intermediate model to staging models
                     for stg_id in stg_group:
-                        self.G.add_edge(stg_id, model_id, relationship="source_to_target")
+                        self._add_edge(stg_id, model_id, relationship="source_to_target")
                     
                     int_models.append(model_id)
                     
                     # Create columns for intermediate model if allowed
                     if can_create_columns:
                         col_count = random.randint(5, 15)
-                        for j in range(col_count):
-                            if team_node_counts[team_id] >= nodes_per_team:
-                                break
-                            
-                            model_col_name = self._generate_random_field_name()
-                            model_col_id = f"{model_id}.{model_col_name}"
+                        # The staging columns don't change while this model's columns are added
+                        group_columns = [self._columns_by_table.get(stg_id, ()) for stg_id in stg_group]
+                        col_count = min(col_count, nodes_per_team - team_node_counts[team_id])
+                        model_col_prefix = model_id + "."
+                        model_full_prefix = f"{project_name}.{model_name}."
+                        model_col_names = self._generate_random_field_names(col_count)
+                        data_types = self._get_random_data_types(col_count)
+                        for model_col_name, data_type in zip(model_col_names, data_types):
+                            model_col_id = model_col_prefix + model_col_name
                             
                             # Add model column node
-                            self.G.add_node(model_col_id,
+                            self._add_node(model_col_id,
                                             id=model_col_id,
                                             name=model_col_name,
-                                            full_name=f"{project_name}.{model_name}.{model_col_name}",
+                                            full_name=model_full_prefix + model_col_name,
                                             type="column",
-                                            data_type=self._get_random_data_type(),
+                                            data_type=data_type,
                                             data_source=ds_id,
                                             project=project_name,
                                             model=model_name,
                                             team=team_id,
-                                            created_at=datetime.now().isoformat())
-                            team_node_counts[team_id] += 1
+                                            created_at=self._now_iso,
+                                            column_of=model_id)
                             
                             # Connect column to model
-                            self.G.add_edge(model_id, model_col_id, relationship="parent_child")
+                            self._add_edge(model_id, model_col_id, relationship="parent_child")
                             
                             # Connect to source columns from staging models
-                            for stg_id in stg_group:
-                                stg_columns = [n for n in self.G.neighbors(stg_id) if self.G.nodes[n].get("type") == "column"]
+                            for stg_columns in group_columns:
                                 if stg_columns:
                                     source_cols = random.sample(stg_columns, min(2, len(stg_columns)))
                                     for src_col in source_cols:
                                         rel_type = random.choice(["source_to_target", "transforms", "references"])
-                                        self.G.add_edge(src_col, model_col_id, relationship=rel_type)
+                                        self._add_edge(src_col, model_col_id, relationship=rel_type)
+                        
+                        team_node_counts[team_id] += col_count
                 
                 # Create mart models
                 mart_model_count = random.randint(3, 10)
@@ -866,14 +1036,13 @@ class LineageGraphGenerator:
                 
                 # Group intermediate models for mart models
                 int_model_groups = []
-                remaining_int = int_models.copy()
+                random.shuffle(int_models)  # Not used again after grouping
                 
-                while remaining_int:
-                    group_size = min(random.randint(1, 4), len(remaining_int))
-                    group = random.sample(remaining_int, group_size)
-                    for m in group:
-                        remaining_int.remove(m)
-                    int_model_groups.append(group)
+                start = 0
+                while start < len(int_models):
+                    group_size = min(random.randint(1, 4), len(int_models) - start)
+                    int_model_groups.append(int_models[start:start + group_size])
+                    start += group_size
                 
                 for i, int_group in enumerate(int_model_groups):
                     if team_node_counts[team_id] >= nodes_per_team or i >= mart_model_count:
@@ -883,7 +1052,7 @@ class LineageGraphGenerator:
                     model_id = f"{ds_id}.{project_name}.{model_name}"
                     
                     # Add model node
-                    self.G.add_node(model_id,
+                    self._add_node(model_id,
                                     id=model_id,
                                     name=model_name,
                                     full_name=f"{project_name}.{model_name}",
@@ -892,50 +1061,53 @@ class LineageGraphGenerator:
                                     data_source=ds_id,
                                     project=project_name,
                                     team=team_id,
-                                    created_at=datetime.now().isoformat())
+                                    created_at=self._now_iso)
                     team_node_counts[team_id] += 1
                     
                     # Connect mart model to intermediate models
                     for int_id in int_group:
-                        self.G.add_edge(int_id, model_id, relationship="source_to_target")
+                        self._add_edge(int_id, model_id, relationship="source_to_target")
                     
                     mart_models.append(model_id)
                     
                     # Create columns for mart model if allowed
                     if can_create_columns:
                         col_count = random.randint(5, 20)
-                        for j in range(col_count):
-                            if team_node_counts[team_id] >= nodes_per_team:
-                                break
-                            
-                            model_col_name = self._generate_random_field_name()
-                            model_col_id = f"{model_id}.{model_col_name}"
+                        group_columns = [self._columns_by_table.get(int_id, ()) for int_id in int_group]
+                        col_count = min(col_count, nodes_per_team - team_node_counts[team_id])
+                        model_col_prefix = model_id + "."
+                        model_full_prefix = f"{project_name}.{model_name}."
+                        model_col_names = self._generate_random_field_names(col_count)
+                        data_types = self._get_random_data_types(col_count)
+                        for model_col_name, data_type in zip(model_col_names, data_types):
+                            model_col_id = model_col_prefix + model_col_name
                             
                             # Add model column node
-                            self.G.add_node(model_col_id,
+                            self._add_node(model_col_id,
                                             id=model_col_id,
                                             name=model_col_name,
-                                            full_name=f"{project_name}.{model_name}.{model_col_name}",
+                                            full_name=model_full_prefix + model_col_name,
                                             type="column",
-                                            data_type=self._get_random_data_type(),
+                                            data_type=data_type,
                                             data_source=ds_id,
                                             project=project_name,
                                             model=model_name,
                                             team=team_id,
-                                            created_at=datetime.now().isoformat())
-                            team_node_counts[team_id] += 1
+                                            created_at=self._now_iso,
+                                            column_of=model_id)
                             
                             # Connect column to model
-                            self.G.add_edge(model_id, model_col_id, relationship="parent_child")
+                            self._add_edge(model_id, model_col_id, relationship="parent_child")
                             
                             # Connect to columns from intermediate models
-                            for int_id in int_group:
-                                int_columns = [n for n in self.G.neighbors(int_id) if self.G.nodes[n].get("type") == "column"]
+                            for int_columns in group_columns:
                                 if int_columns:
                                     source_cols = random.sample(int_columns, min(2, len(int_columns)))
                                     for src_col in source_cols:
                                         rel_type = random.choice(["source_to_target", "transforms", "references", "aggregates"])
-                                        self.G.add_edge(src_col, model_col_id, relationship=rel_type)
+                                        self._add_edge(src_col, model_col_id, relationship=rel_type)
+                        
+                        team_node_counts[team_id] += col_count
 
     def _generate_bi_assets(self, team, data_source, team_node_counts, nodes_per_team):
         """Generate BI assets (dashboards, reports, metrics)"""
@@ -946,7 +1118,7 @@ class LineageGraphGenerator:
             return
         
         # Check if we can create BI assets for this data source
-        valid_asset_types = self.get_valid_asset_types_for_data_source(ds_id)
+        valid_asset_types = self._ds_asset_type_sets.get(ds_id, frozenset())
         
         can_create_dashboards = "dashboard" in valid_asset_types
         can_create_reports = "report" in valid_asset_types
@@ -958,9 +1130,12 @@ class LineageGraphGenerator:
             return
         
         # Find potential source tables, views, and models to connect to BI assets
-        potential_sources = [n for n in self.G.nodes() 
-                            if self.G.nodes[n].get("type") in ["table", "view", "model"] and 
-                               self.G.nodes[n].get("team") == team_id]
+        potential_sources = self._get_team_nodes(team_id, "table", "view", "model")
+        # Resolve the rules for edges whose endpoint types are fixed once, so
+        # those edges skip per-edge validation
+        col_metric_rels = self.get_valid_relationships("column", "metric")
+        dashboard_report_ok = self.is_valid_relationship("dashboard", "report", "parent_child")
+        report_metric_ok = self.is_valid_relationship("report", "metric", "parent_child")
         
         if not potential_sources:
             return
@@ -978,14 +1153,14 @@ class LineageGraphGenerator:
                 dashboard_id = f"{ds_id}.{dashboard_name}"
                 
                 # Add dashboard node
-                self.G.add_node(dashboard_id,
+                self._add_node(dashboard_id,
                                 id=dashboard_id,
                                 name=dashboard_name,
                                 full_name=f"{ds_id} - {dashboard_name}",
                                 type="dashboard",
                                 data_source=ds_id,
                                 team=team_id,
-                                created_at=datetime.now().isoformat())
+                                created_at=self._now_iso)
                 team_node_counts[team_id] += 1
                 dashboards.append(dashboard_id)
                 
@@ -1002,7 +1177,7 @@ class LineageGraphGenerator:
                         report_id = f"{dashboard_id}.{report_name}"
                         
                         # Add report node
-                        self.G.add_node(report_id,
+                        self._add_node(report_id,
                                         id=report_id,
                                         name=report_name,
                                         full_name=f"{ds_id} - {dashboard_name} - {report_name}",
@@ -1010,11 +1185,12 @@ class LineageGraphGenerator:
                                         data_source=ds_id,
                                         dashboard=dashboard_name,
                                         team=team_id,
-                                        created_at=datetime.now().isoformat())
+                                        created_at=self._now_iso)
                         team_node_counts[team_id] += 1
                         
                         # Connect report to dashboard
-                        self.add_edge_with_validation(dashboard_id, report_id, "parent_child")
+                        if dashboard_report_ok:
+                            self._add_edge(dashboard_id, report_id, relationship="parent_child")
                         
                         # Connect report to source tables/views/models (1-3 sources per report)
                         source_count = min(random.randint(1, 3), len(potential_sources))
@@ -1028,15 +1204,16 @@ class LineageGraphGenerator:
                             # Generate 2-10 metrics per report
                             metric_count = random.randint(2, 10)
                             
-                            for k in range(metric_count):
-                                if team_node_counts[team_id] >= nodes_per_team:
-                                    return
-                                
+                            # Each metric is a single node, so bound the loop by the
+                            # remaining budget instead of checking it per metric
+                            remaining = nodes_per_team - team_node_counts[team_id]
+                            
+                            for k in range(min(metric_count, remaining)):
                                 metric_name = self._generate_random_name("metric")
                                 metric_id = f"{report_id}.{metric_name}"
                                 
                                 # Add metric node
-                                self.G.add_node(metric_id,
+                                self._add_node(metric_id,
                                                 id=metric_id,
                                                 name=metric_name,
                                                 full_name=f"{ds_id} - {report_name} - {metric_name}",
@@ -1044,42 +1221,44 @@ class LineageGraphGenerator:
                                                 data_source=ds_id,
                                                 report=report_name,
                                                 team=team_id,
-                                                created_at=datetime.now().isoformat())
-                                team_node_counts[team_id] += 1
+                                                created_at=self._now_iso)
                                 
                                 # Connect metric to report
-                                self.add_edge_with_validation(report_id, metric_id, "parent_child")
+                                if report_metric_ok:
+                                    self._add_edge(report_id, metric_id, relationship="parent_child")
                                 
                                 # Connect metric to columns in source tables
                                 for source_id in sources:
                                     # Get columns from source
-                                    columns = [n for n in self.G.neighbors(source_id) if self.G.nodes[n].get("type") == "column"]
+                                    columns = self._columns_by_table.get(source_id, ())
                                     
                                     if columns:
                                         # Pick 1-3 columns to connect to this metric
-                                        col_count = min(random.randint(1, 3), len(columns))
+                                        col_count = min(1 + self._rand_index(3), len(columns))
                                         source_columns = random.sample(columns, col_count)
                                         
                                         for col_id in source_columns:
-                                            valid_rels = self.get_valid_relationships("column", "metric")
-                                            if valid_rels:
-                                                rel_type = random.choice(valid_rels)
-                                                self.add_edge_with_validation(col_id, metric_id, rel_type)
+                                            if col_metric_rels:
+                                                rel_type = col_metric_rels[self._rand_index(len(col_metric_rels))]
+                                                self._add_edge(col_id, metric_id, relationship=rel_type)
+                            
+                            team_node_counts[team_id] += min(metric_count, remaining)
+                            if metric_count > remaining:
+                                return
                 
                 # Generate dimensions if allowed
                 if can_create_dimensions and potential_sources:
                     # Generate 3-8 dimensions per dashboard
                     dimension_count = random.randint(3, 8)
                     
-                    for j in range(dimension_count):
-                        if team_node_counts[team_id] >= nodes_per_team:
-                            return
-                        
+                    remaining = nodes_per_team - team_node_counts[team_id]
+                    
+                    for j in range(min(dimension_count, remaining)):
                         dimension_name = self._generate_random_name("dim")
                         dimension_id = f"{dashboard_id}.{dimension_name}"
                         
                         # Add dimension node
-                        self.G.add_node(dimension_id,
+                        self._add_node(dimension_id,
                                         id=dimension_id,
                                         name=dimension_name,
                                         full_name=f"{ds_id} - {dashboard_name} - {dimension_name}",
@@ -1087,33 +1266,35 @@ class LineageGraphGenerator:
                                         data_source=ds_id,
                                         dashboard=dashboard_name,
                                         team=team_id,
-                                        created_at=datetime.now().isoformat())
-                        team_node_counts[team_id] += 1
+                                        created_at=self._now_iso)
                         
                         # Link dimension to a source
-                        source_id = random.choice(potential_sources)
+                        source_id = potential_sources[self._rand_index(len(potential_sources))]
                         self.add_edge_with_validation(source_id, dimension_id, "references")
                         
                         # Link to specific columns
-                        columns = [n for n in self.G.neighbors(source_id) if self.G.nodes[n].get("type") == "column"]
+                        columns = self._columns_by_table.get(source_id, ())
                         if columns:
-                            col_id = random.choice(columns)
+                            col_id = columns[self._rand_index(len(columns))]
                             self.add_edge_with_validation(col_id, dimension_id, "references")
+                    
+                    team_node_counts[team_id] += min(dimension_count, remaining)
+                    if dimension_count > remaining:
+                        return
                 
                 # Generate measures if allowed
                 if can_create_measures and potential_sources:
                     # Generate 4-12 measures per dashboard
                     measure_count = random.randint(4, 12)
                     
-                    for j in range(measure_count):
-                        if team_node_counts[team_id] >= nodes_per_team:
-                            return
-                        
+                    remaining = nodes_per_team - team_node_counts[team_id]
+                    
+                    for j in range(min(measure_count, remaining)):
                         measure_name = self._generate_random_name("measure")
                         measure_id = f"{dashboard_id}.{measure_name}"
                         
                         # Add measure node
-                        self.G.add_node(measure_id,
+                        self._add_node(measure_id,
                                         id=measure_id,
                                         name=measure_name,
                                         full_name=f"{ds_id} - {dashboard_name} - {measure_name}",
@@ -1121,18 +1302,21 @@ class LineageGraphGenerator:
                                         data_source=ds_id,
                                         dashboard=dashboard_name,
                                         team=team_id,
-                                        created_at=datetime.now().isoformat())
-                        team_node_counts[team_id] += 1
+                                        created_at=self._now_iso)
                         
                         # Link measure to a source
-                        source_id = random.choice(potential_sources)
+                        source_id = potential_sources[self._rand_index(len(potential_sources))]
                         self.add_edge_with_validation(source_id, measure_id, "references")
                         
                         # Link to specific columns
-                        columns = [n for n in self.G.neighbors(source_id) if self.G.nodes[n].get("type") == "column"]
+                        columns = self._columns_by_table.get(source_id, ())
                         if columns:
-                            col_id = random.choice(columns)
+                            col_id = columns[self._rand_index(len(columns))]
                             self.add_edge_with_validation(col_id, measure_id, "aggregates")
+                    
+                    team_node_counts[team_id] += min(measure_count, remaining)
+                    if measure_count > remaining:
+                        return
 
     def _generate_orchestration_assets(self, team, data_source, team_node_counts, nodes_per_team):
         """Generate orchestration assets (workflows, jobs)"""
@@ -1143,7 +1327,7 @@ class LineageGraphGenerator:
             return
         
         # Check if we can create orchestration assets for this data source
-        valid_asset_types = self.get_valid_asset_types_for_data_source(ds_id)
+        valid_asset_types = self._ds_asset_type_sets.get(ds_id, frozenset())
         
         can_create_workflows = "workflow" in valid_asset_types
         can_create_jobs = "job" in valid_asset_types
@@ -1156,6 +1340,15 @@ class LineageGraphGenerator:
         if not (can_create_workflows and can_create_jobs):
             return
         
+        # Both endpoint types are fixed for the workflow->job and job->job edges
+        workflow_job_ok = self.is_valid_relationship("workflow", "job", "parent_child")
+        job_job_ok = self.is_valid_relationship("job", "job", "depends_on")
+        
+        # Jobs connect to the team's tables, views and models, none of which are
+        # created here, so the candidates and their relationships are fixed
+        potential_targets = self._get_team_nodes(team_id, "table", "view", "model")
+        rels_by_target_type = {t: self.get_valid_relationships("job", t) for t in ("table", "view", "model")}
+        
         # Generate 2-10 workflows
         workflow_count = random.randint(2, 10)
         
@@ -1167,19 +1360,20 @@ class LineageGraphGenerator:
             workflow_id = f"{ds_id}.{workflow_name}"
             
             # Add workflow node
-            self.G.add_node(workflow_id,
+            self._add_node(workflow_id,
                             id=workflow_id,
                             name=workflow_name,
                             full_name=f"{ds_id} - {workflow_name}",
                             type="workflow",
                             data_source=ds_id,
                             team=team_id,
-                            created_at=datetime.now().isoformat())
+                            created_at=self._now_iso)
             team_node_counts[team_id] += 1
             
             # Generate 5-20 jobs per workflow
             job_count = random.randint(5, 20)
             prev_job_id = None
+            jobs = []
             
             for j in range(job_count):
                 if team_node_counts[team_id] >= nodes_per_team:
@@ -1189,7 +1383,7 @@ class LineageGraphGenerator:
                 job_id = f"{workflow_id}.{job_name}"
                 
                 # Add job node
-                self.G.add_node(job_id,
+                self._add_node(job_id,
                                 id=job_id,
                                 name=job_name,
                                 full_name=f"{ds_id} - {workflow_name} - {job_name}",
@@ -1197,36 +1391,36 @@ class LineageGraphGenerator:
                                 data_source=ds_id,
                                 workflow=workflow_name,
                                 team=team_id,
-                                created_at=datetime.now().isoformat())
+                                created_at=self._now_iso)
                 team_node_counts[team_id] += 1
                 
                 # Connect job to workflow
-                self.add_edge_with_validation(workflow_id, job_id, "parent_child")
+                if workflow_job_ok:
+                    self._add_edge(workflow_id, job_id, relationship="parent_child")
+                    jobs.append(job_id)
                 
                 # Connect job to previous job (job dependency)
-                if prev_job_id:
-                    self.add_edge_with_validation(prev_job_id, job_id, "depends_on")
+                if prev_job_id and job_job_ok:
+                    self._add_edge(prev_job_id, job_id, relationship="depends_on")
                 
                 prev_job_id = job_id
             
             # Connect jobs to other assets (tables, models, etc.)
-            jobs = [n for n in self.G.neighbors(workflow_id)]
-            potential_targets = [n for n in self.G.nodes() 
-                               if self.G.nodes[n].get("type") in ["table", "view", "model"] and 
-                                  self.G.nodes[n].get("team") == team_id]
-            
             if potential_targets and jobs:
-                # For each job, connect to 0-2 targets
-                for job_id in jobs:
-                    if random.random() < 0.8:  # 80% chance of having a target
-                        target_count = min(random.randint(1, 2), len(potential_targets))
-                        targets = random.sample(potential_targets, target_count)
-                        
-                        for target_id in targets:
-                            valid_rels = self.get_valid_relationships("job", self.G.nodes[target_id].get("type", "unknown"))
-                            if valid_rels:
-                                rel_type = random.choice(valid_rels)
-                                self.add_edge_with_validation(job_id, target_id, rel_type)
+                # For each job, connect to 0-2 targets: 80% chance of having any
+                has_target = [random.random() < 0.8 for _ in jobs]
+                target_counts = random.choices((1, 2), k=len(jobs))
+                max_targets = len(potential_targets)
+                
+                for job_id, wanted, target_count in zip(jobs, has_target, target_counts):
+                    if not wanted:
+                        continue
+                    
+                    for target_id in random.sample(potential_targets, min(target_count, max_targets)):
+                        valid_rels = rels_by_target_type[self._node_type[target_id]]
+                        if valid_rels:
+                            # Picked from the allowed list, so no further validation is needed
+                            self._add_edge(job_id, target_id, relationship=random.choice(valid_rels))
 
     def _generate_streaming_assets(self, team, data_source, team_node_counts, nodes_per_team):
         """Generate streaming assets (topics)"""
@@ -1237,7 +1431,7 @@ class LineageGraphGenerator:
             return
         
         # Check if we can create streaming assets for this data source
-        valid_asset_types = self.get_valid_asset_types_for_data_source(ds_id)
+        valid_asset_types = self._ds_asset_type_sets.get(ds_id, frozenset())
         
         can_create_topics = "topic" in valid_asset_types
         can_create_schemas = "schema" in valid_asset_types
@@ -1245,6 +1439,14 @@ class LineageGraphGenerator:
         if not can_create_topics:
             return
         
+        # Producers and consumers are the team's existing jobs, tables and models;
+        # none are created here, so look them up once and check which endpoint
+        # types accept the fixed relationships instead of validating each edge
+        potential_producers = self._get_team_nodes(team_id, "job", "table")
+        potential_consumers = self._get_team_nodes(team_id, "job", "table", "model")
+        produces_ok = {t: self.is_valid_relationship(t, "topic", "produces") for t in ("job", "table")}
+        consumes_ok = {t: self.is_valid_relationship("topic", t, "consumes") for t in ("job", "table", "model")}
+        
         # Generate 5-20 topics
         topic_count = random.randint(5, 20)
         
@@ -1256,14 +1458,14 @@ class LineageGraphGenerator:
             topic_id = f"{ds_id}.{topic_name}"
             
             # Add topic node
-            self.G.add_node(topic_id,
+            self._add_node(topic_id,
                             id=topic_id,
                             name=topic_name,
                             full_name=f"{ds_id} - {topic_name}",
                             type="topic",
                             data_source=ds_id,
                             team=team_id,
-                            created_at=datetime.now().isoformat())
+                            created_at=self._now_iso)
             team_node_counts[team_id] += 1
             
             # Add schema for topic if allowed
@@ -1272,7 +1474,7 @@ class LineageGraphGenerator:
                 schema_id = f"{topic_id}.{schema_name}"
                 
                 # Add schema node for the topic
-                self.G.add_node(schema_id,
+                self._add_node(schema_id,
                                 id=schema_id,
                                 name=schema_name,
                                 full_name=f"{ds_id} - {topic_name} - Schema",
@@ -1280,20 +1482,11 @@ class LineageGraphGenerator:
                                 data_source=ds_id,
                                 topic=topic_name,
                                 team=team_id,
-                                created_at=datetime.now().isoformat())
+                                created_at=self._now_iso)
                 team_node_counts[team_id] += 1
                 
                 # Connect schema to topic
-                self.G.add_edge(topic_id, schema_id, relationship="parent_child")
-            
-            # Connect topic to producers and consumers
-            potential_producers = [n for n in self.G.nodes() 
-                                 if self.G.nodes[n].get("type") in ["job", "table"] and 
-                                    self.G.nodes[n].get("team") == team_id]
-            
-            potential_consumers = [n for n in self.G.nodes() 
-                                 if self.G.nodes[n].get("type") in ["job", "table", "model"] and 
-                                    self.G.nodes[n].get("team") == team_id]
+                self._add_edge(topic_id, schema_id, relationship="parent_child")
             
             # Connect to 0-3 producers
             if potential_producers:
@@ -1301,7 +1494,8 @@ class LineageGraphGenerator:
                 if producer_count > 0:
                     producers = random.sample(potential_producers, producer_count)
                     for producer_id in producers:
-                        self.add_edge_with_validation(producer_id, topic_id, "produces")
+                        if produces_ok[self._node_type[producer_id]]:
+                            self._add_edge(producer_id, topic_id, relationship="produces")
             
             # Connect to 0-5 consumers
             if potential_consumers:
@@ -1309,7 +1503,8 @@ class LineageGraphGenerator:
                 if consumer_count > 0:
                     consumers = random.sample(potential_consumers, consumer_count)
                     for consumer_id in consumers:
-                        self.add_edge_with_validation(topic_id, consumer_id, "consumes")
+                        if consumes_ok[self._node_type[consumer_id]]:
+                            self._add_edge(topic_id, consumer_id, relationship="consumes")
 
     def _generate_storage_assets(self, team, data_source, team_node_counts, nodes_per_team):
         """Generate storage assets (buckets)"""
@@ -1320,13 +1515,21 @@ class LineageGraphGenerator:
             return
         
         # Check if we can create storage assets for this data source
-        valid_asset_types = self.get_valid_asset_types_for_data_source(ds_id)
+        valid_asset_types = self._ds_asset_type_sets.get(ds_id, frozenset())
         
         can_create_buckets = "bucket" in valid_asset_types
         
         if not can_create_buckets:
             return
         
+        # Jobs and tables aren't created here, so look them up once; the
+        # relationships allowed in each direction are fixed too
+        potential_jobs = self._get_team_nodes(team_id, "job")
+        potential_tables = self._get_team_nodes(team_id, "table")
+        job_bucket_rels = self.get_valid_relationships("job", "bucket")
+        bucket_job_rels = self.get_valid_relationships("bucket", "job")
+        bucket_table_ok = self.is_valid_relationship("bucket", "table", "populates")
+        
         # Generate 2-10 buckets
         bucket_count = random.randint(2, 10)
         
@@ -1338,60 +1541,47 @@ class LineageGraphGenerator:
             bucket_id = f"{ds_id}.{bucket_name}"
             
             # Add bucket node
-            self.G.add_node(bucket_id,
+            self._add_node(bucket_id,
                             id=bucket_id,
                             name=bucket_name,
                             full_name=f"{ds_id} - {bucket_name}",
                             type="bucket",
                             data_source=ds_id,
                             team=team_id,
-                            created_at=datetime.now().isoformat())
+                            created_at=self._now_iso)
             team_node_counts[team_id] += 1
             
             # Connect bucket to jobs that produce or consume data from it
-            potential_jobs = [n for n in self.G.nodes() 
-                            if self.G.nodes[n].get("type") == "job" and 
-                               self.G.nodes[n].get("team") == team_id]
-            
-            if potential_jobs:
+            if potential_jobs and job_bucket_rels:
                 job_count = min(random.randint(1, 5), len(potential_jobs))
                 jobs = random.sample(potential_jobs, job_count)
                 
                 for job_id in jobs:
-                    # Random direction of relationship (job -> bucket or bucket -> job)
-                    valid_rels = self.get_valid_relationships("job", "bucket")
-                    if valid_rels:
-                        rel_type = random.choice(valid_rels)
-                        if random.random() < 0.5:
-                            self.add_edge_with_validation(job_id, bucket_id, rel_type)
-                        else:
-                            self.add_edge_with_validation(bucket_id, job_id, rel_type)
+                    # Random direction of relationship (job -> bucket or bucket -> job);
+                    # the job -> bucket relationship is kept only where bucket -> job allows it
+                    rel_type = random.choice(job_bucket_rels)
+                    if random.random() < 0.5:
+                        self._add_edge(job_id, bucket_id, relationship=rel_type)
+                    elif rel_type in bucket_job_rels:
+                        self._add_edge(bucket_id, job_id, relationship=rel_type)
             
             # Connect bucket to tables (ETL processes that load data from bucket to tables)
-            potential_tables = [n for n in self.G.nodes() 
-                              if self.G.nodes[n].get("type") == "table" and 
-                                 self.G.nodes[n].get("team") == team_id]
-            
-            if potential_tables:
+            if potential_tables and bucket_table_ok:
                 table_count = min(random.randint(0, 3), len(potential_tables))
                 if table_count > 0:
                     tables = random.sample(potential_tables, table_count)
                     for table_id in tables:
-                        self.add_edge_with_validation(bucket_id, table_id, "populates")
+                        self._add_edge(bucket_id, table_id, relationship="populates")
 
     def _generate_cross_team_lineage(self):
         """Generate lineage connections between assets from different teams"""
-        # Get nodes by team
-        nodes_by_team = {}
-        for team in self.teams:
-            team_id = team["id"]
-            nodes_by_team[team_id] = [n for n in self.G.nodes() if self.G.nodes[n].get("team") == team_id]
+        col_col_rels = self.get_valid_relationships("column", "column")
         
         # For each team, create connections to other teams' assets
-        for src_team_id, src_nodes in nodes_by_team.items():
-            # Filter source nodes to only include tables, views, and models
-            src_data_assets = [n for n in src_nodes 
-                             if self.G.nodes[n].get("type") in ["table", "view", "model", "topic"]]
+        for team in self.teams:
+            src_team_id = team["id"]
+            # Source assets are tables, views, models and topics
+            src_data_assets = self._get_team_nodes(src_team_id, "table", "view", "model", "topic")
             
             if not src_data_assets:
                 continue
@@ -1406,22 +1596,24 @@ class LineageGraphGenerator:
             
             for tgt_team_id in target_teams:
                 # Find potential target assets
-                tgt_data_assets = [n for n in nodes_by_team[tgt_team_id] 
-                                if self.G.nodes[n].get("type") in ["table", "view", "model"]]
+                tgt_data_assets = self._get_team_nodes(tgt_team_id, "table", "view", "model")
                 
                 if not tgt_data_assets:
                     continue
                 
                 # Create 2-10 cross-team connections
                 connection_count = min(random.randint(2, 10), len(src_data_assets), len(tgt_data_assets))
+                src_idx = self.rng.integers(0, len(src_data_assets), size=connection_count).tolist()
+                tgt_idx = self.rng.integers(0, len(tgt_data_assets), size=connection_count).tolist()
+                field_mask = (self.rng.random(connection_count) < 0.3).tolist()  # 30% chance of field-level lineage
                 
-                for _ in range(connection_count):
-                    src_asset = random.choice(src_data_assets)
-                    tgt_asset = random.choice(tgt_data_assets)
+                for s, t, with_fields in zip(src_idx, tgt_idx, field_mask):
+                    src_asset = src_data_assets[s]
+                    tgt_asset = tgt_data_assets[t]
                     
                     # Get source and target types
-                    src_type = self.G.nodes[src_asset].get("type", "unknown")
-                    tgt_type = self.G.nodes[tgt_asset].get("type", "unknown")
+                    src_type = self._node_type.get(src_asset, "unknown")
+                    tgt_type = self._node_type.get(tgt_asset, "unknown")
                     
                     # Get valid relationship types for this pair
                     valid_rels = self.get_valid_relationships(src_type, tgt_type)
@@ -1431,23 +1623,19 @@ class LineageGraphGenerator:
                         self.add_edge_with_validation(src_asset, tgt_asset, rel_type)
                     
                         # Also create field-level lineage for some connections
-                        if random.random() < 0.3:  # 30% chance
-                            src_columns = [n for n in self.G.neighbors(src_asset) 
-                                         if self.G.nodes[n].get("type") == "column"]
-                            tgt_columns = [n for n in self.G.neighbors(tgt_asset) 
-                                         if self.G.nodes[n].get("type") == "column"]
+                        if with_fields:
+                            src_columns = self._columns_by_table.get(src_asset, ())
+                            tgt_columns = self._columns_by_table.get(tgt_asset, ())
                             
                             if src_columns and tgt_columns:
                                 # Create 1-5 field-level connections
                                 field_count = min(random.randint(1, 5), len(src_columns), len(tgt_columns))
                                 
-                                for _ in range(field_count):
-                                    src_col = random.choice(src_columns)
-                                    tgt_col = random.choice(tgt_columns)
-                                    
-                                    valid_col_rels = self.get_valid_relationships("column", "column")
-                                    if valid_col_rels:
-                                        field_rel_type = random.choice(valid_col_rels)
+                                if col_col_rels:
+                                    src_cols = random.choices(src_columns, k=field_count)
+                                    tgt_cols = random.choices(tgt_columns, k=field_count)
+                                    field_rel_types = random.choices(col_col_rels, k=field_count)
+                                    for src_col, tgt_col, field_rel_type in zip(src_cols, tgt_cols, field_rel_types):
                                         self.add_edge_with_validation(src_col, tgt_col, field_rel_type)
 
     def _add_additional_nodes(self, count):
@@ -1463,6 +1651,21 @@ class LineageGraphGenerator:
             team_id = self.teams[i % len(self.teams)]["id"]
             team_allocation[team_id] += 1
         
+        # Group the existing nodes by team from the type index; new nodes are
+        # appended as they're added so later ones can connect to them
+        team_nodes = defaultdict(list)
+        for (node_team, _), ids in self._nodes_by_team_type.items():
+            team_nodes[node_team].extend(ids)
+        
+        # Data sources that support at least one asset type; the same for every team
+        valid_data_sources = []
+        for ds in self.data_sources:
+            if len(self.get_valid_asset_types_for_data_source(ds["id"])) > 0:
+                valid_data_sources.append(ds)
+        
+        if not valid_data_sources:
+            return
+        
         # Add nodes for each team
         for team in self.teams:
             team_id = team["id"]
@@ -1472,15 +1675,6 @@ class LineageGraphGenerator:
                 continue
             
             # Choose a random data source for this team
-            # But ensure it supports the asset types we want to create
-            valid_data_sources = []
-            for ds in self.data_sources:
-                if len(self.get_valid_asset_types_for_data_source(ds["id"])) > 0:
-                    valid_data_sources.append(ds)
-            
-            if not valid_data_sources:
-                continue
-            
             data_source = random.choice(valid_data_sources)
             ds_id = data_source["id"]
             
@@ -1497,19 +1691,17 @@ class LineageGraphGenerator:
                 asset_id = f"additional.{team_id}.{asset_type}.{asset_name}"
                 
                 # Add the node
-                self.G.add_node(asset_id,
+                self._add_node(asset_id,
                                 id=asset_id,
                                 name=asset_name,
                                 full_name=f"Additional {asset_type} - {asset_name}",
                                 type=asset_type,
                                 data_source=ds_id,
                                 team=team_id,
-                                created_at=datetime.now().isoformat())
+                                created_at=self._now_iso)
                 
                 # Connect it to some existing nodes of compatible types
-                existing_nodes = [n for n in self.G.nodes() 
-                                if self.G.nodes[n].get("team") == team_id and 
-                                self.G.nodes[n].get("id") != asset_id]  # Avoid self-connections
+                existing_nodes = team_nodes[team_id]
                 
                 if existing_nodes:
                     # Connect to 1-3 existing nodes
@@ -1517,90 +1709,97 @@ class LineageGraphGenerator:
                     targets = random.sample(existing_nodes, connection_count)
                     
                     for target_id in targets:
-                        valid_rels = self.get_valid_relationships(asset_type, self.G.nodes[target_id].get("type", "unknown"))
+                        valid_rels = self.get_valid_relationships(asset_type, self._node_type.get(target_id, "unknown"))
                         if valid_rels:
                             rel_type = random.choice(valid_rels)
                             self.add_edge_with_validation(asset_id, target_id, rel_type)
+                
+                team_nodes[team_id].append(asset_id)
 
     def _add_additional_edges(self, count):
         """Add additional edges to reach the target edge count"""
-        # Get all nodes in the graph
-        nodes = list(self.G.nodes())
-        
-        if len(nodes) < 2:
+        graph = self.G
+        
+        # Lay the node ids, types and data sources out as parallel lists once,
+        # keeping only nodes whose type is valid for their data source, so
+        # each attempt is a couple of list indexes instead of attribute lookups
+        ids = list(graph.nodes())
+        types = [self._node_type.get(n, "unknown") for n in ids]
+        dsrcs = [attrs.get("data_source", "unknown") for _, attrs in graph.nodes(data=True)]
+        valid_idx = [i for i, (t, d) in enumerate(zip(types, dsrcs))
+                     if self.is_valid_asset_for_data_source(t, d)]
+        
+        if len(valid_idx) < 2:
             return
         
+        # Existing edges plus the ones drawn here, for the duplicate check
+        existing = set(graph.edges())
+        new_edges = []
+        
         edges_added = 0
         max_attempts = count * 10  # Avoid infinite loop
         attempts = 0
+        valid_count = len(valid_idx)
         
         while edges_added < count and attempts < max_attempts:
             attempts += 1
             
             # Pick two random nodes
-            source = random.choice(nodes)
-            target = random.choice(nodes)
+            i = valid_idx[self._rand_index(valid_count)]
+            j = valid_idx[self._rand_index(valid_count)]
             
             # Avoid self-loops
-            if source == target:
+            if i == j:
                 continue
             
             # Avoid duplicate edges
-            if self.G.has_edge(source, target):
+            source = ids[i]
+            target = ids[j]
+            if (source, target) in existing:
                 continue
             
-            # Get types and validate relationship
-            source_type = self.G.nodes[source].get("type", "unknown")
-            target_type = self.G.nodes[target].get("type", "unknown")
-            
-            # Also validate that the relationship makes sense given the data source restrictions
-            source_ds = self.G.nodes[source].get("data_source", "unknown")
-            target_ds = self.G.nodes[target].get("data_source", "unknown")
-            
-            # Check if these types are valid for their data sources
-            if not self.is_valid_asset_for_data_source(source_type, source_ds) or \
-               not self.is_valid_asset_for_data_source(target_type, target_ds):
-                continue
-            
-            valid_rels = self.get_valid_relationships(source_type, target_type)
+            valid_rels = self.get_valid_relationships(types[i], types[j])
             
             if valid_rels:
-                rel_type = random.choice(valid_rels)
-                if self.add_edge_with_validation(source, target, rel_type):
-                    edges_added += 1
+                # Picked from the allowed list, so no further validation is needed
+                existing.add((source, target))
+                new_edges.append((source, target, {"relationship": valid_rels[self._rand_index(len(valid_rels))]}))
+                edges_added += 1
+        
+        graph.add_edges_from(new_edges)
 
     def _create_orphaned_nodes(self):
         """
         Create orphaned nodes by removing all edges connected to selected nodes
         """
         print("Creating orphaned nodes...")
-        all_nodes = list(self.G.nodes())
-        num_orphans = int(len(all_nodes) * self.orphaned_node_percent)
+        graph = self.G
+        num_orphans = int(graph.number_of_nodes() * self.orphaned_node_percent)
         
         # Select nodes to orphan - prefer nodes that are not critical to the graph structure
         # Avoid orphaning schema nodes or parent nodes with many children
-        candidate_nodes = [node for node in all_nodes if 
-                          self.G.nodes[node].get('type') not in ['schema', 'workflow', 'dashboard'] and
-                          len(list(self.G.successors(node))) <= 3 and
-                          len(list(self.G.predecessors(node))) <= 3]
+        out_degree = graph.out_degree
+        in_degree = graph.in_degree
+        candidate_nodes = [node for node in graph if 
+                          self._node_type.get(node) not in ('schema', 'workflow', 'dashboard') and
+                          out_degree(node) <= 3 and
+                          in_degree(node) <= 3]
         
         if len(candidate_nodes) < num_orphans:
-            candidate_nodes = all_nodes
+            candidate_nodes = list(graph)
         
         orphan_nodes = random.sample(candidate_nodes, min(num_orphans, len(candidate_nodes)))
         
-        # Remove all edges connected to these nodes
+        # Remove all edges connected to these nodes in one call (an edge between
+        # two orphans is listed twice; the second removal is a no-op)
+        edges_to_remove = []
         for node in orphan_nodes:
-            # Get all edges connected to this node
-            in_edges = list(self.G.in_edges(node))
-            out_edges = list(self.G.out_edges(node))
-            
-            # Remove edges
-            self.G.remove_edges_from(in_edges)
-            self.G.remove_edges_from(out_edges)
-            
-            # Mark the node as orphaned
-            self.G.nodes[node]['orphaned'] = True
+            edges_to_remove.extend(graph.in_edges(node))
+            edges_to_remove.extend(graph.out_edges(node))
+        graph.remove_edges_from(edges_to_remove)
+        
+        # Mark the nodes as orphaned
+        nx.set_node_attributes(graph, dict.fromkeys(orphan_nodes, True), 'orphaned')
             
         print(f"Created {len(orphan_nodes)} orphaned nodes")
     
@@ -1627,16 +1826,21 @@ class LineageGraphGenerator:
             central_id = f"disconnected.{i}.{central_type}.{central_name}"
             
             # Add central node
-            self.G.add_node(central_id,
+            self._add_node(central_id,
                            id=central_id,
                            name=central_name,
                            full_name=f"Disconnected {central_type} - {central_name}",
                            type=central_type,
                            data_source=ds_id,
                            team=subgraph_team,
-                           created_at=datetime.now().isoformat(),
+                           created_at=self._now_iso,
                            is_disconnected_subgraph=True)
             
+            # Track this subgraph's nodes and edges locally rather than
+            # rescanning the graph for the is_disconnected_subgraph flag
+            subgraph_nodes = [central_id]
+            subgraph_edges = set()
+            
             # Create child nodes
             for j in range(subgraph_size - 1):
                 # Choose appropriate child type based on central node
@@ -1653,14 +1857,14 @@ class LineageGraphGenerator:
                 child_id = f"disconnected.{i}.{child_type}.{child_name}"
                 
                 # Add child node
-                self.G.add_node(child_id,
+                self._add_node(child_id,
                                id=child_id,
                                name=child_name,
                                full_name=f"Disconnected {child_type} - {child_name}",
                                type=child_type,
                                data_source=ds_id,
                                team=subgraph_team,
-                               created_at=datetime.now().isoformat(),
+                               created_at=self._now_iso,
                                is_disconnected_subgraph=True)
                 
                 # Connect to central node or another node in the subgraph
@@ -1669,62 +1873,57 @@ class LineageGraphGenerator:
                     valid_rels = self.get_valid_relationships(central_type, child_type)
                     if valid_rels:
                         rel_type = random.choice(valid_rels)
-                        self.G.add_edge(central_id, child_id, relationship=rel_type)
+                        self._add_edge(central_id, child_id, relationship=rel_type)
+                        subgraph_edges.add((central_id, child_id))
                 else:
-                    # Connect to another node in the subgraph
-                    # Get all subgraph nodes except the current child
-                    subgraph_nodes = [node for node in self.G.nodes() 
-                                     if self.G.nodes[node].get('is_disconnected_subgraph') == True and
-                                     node != child_id]
+                    # Connect to another node already in the subgraph
+                    potential_parent = random.choice(subgraph_nodes)
+                    parent_type = self._node_type[potential_parent]
                     
-                    if subgraph_nodes:
-                        potential_parent = random.choice(subgraph_nodes)
-                        parent_type = self.G.nodes[potential_parent].get('type')
-                        
-                        valid_rels = self.get_valid_relationships(parent_type, child_type)
-                        if valid_rels:
-                            rel_type = random.choice(valid_rels)
-                            self.G.add_edge(potential_parent, child_id, relationship=rel_type)
+                    valid_rels = self.get_valid_relationships(parent_type, child_type)
+                    if valid_rels:
+                        rel_type = random.choice(valid_rels)
+                        self._add_edge(potential_parent, child_id, relationship=rel_type)
+                        subgraph_edges.add((potential_parent, child_id))
+                
+                subgraph_nodes.append(child_id)
             
             # Create a few edges between nodes in the subgraph to ensure it's connected internally
-            subgraph_nodes = [node for node in self.G.nodes() 
-                             if self.G.nodes[node].get('is_disconnected_subgraph') == True]
-            
-            # Get all possible pairs of nodes in the subgraph
             for _ in range(min(5, len(subgraph_nodes))):
                 source = random.choice(subgraph_nodes)
                 target = random.choice(subgraph_nodes)
                 
                 # Avoid self-loops
-                if source != target and not self.G.has_edge(source, target):
-                    source_type = self.G.nodes[source].get('type')
-                    target_type = self.G.nodes[target].get('type')
+                if source != target and (source, target) not in subgraph_edges:
+                    source_type = self._node_type[source]
+                    target_type = self._node_type[target]
                     
                     valid_rels = self.get_valid_relationships(source_type, target_type)
                     if valid_rels:
                         rel_type = random.choice(valid_rels)
-                        self.G.add_edge(source, target, relationship=rel_type)
+                        self._add_edge(source, target, relationship=rel_type)
+                        subgraph_edges.add((source, target))
         
         print(f"Created {self.disconnected_subgraphs} disconnected subgraphs")
     
     def _analyze_connectivity(self):
         """Analyze the connectivity of the graph"""
-        # Convert to undirected graph to find connected components
-        undirected = self.G.to_undirected()
+        graph = self.G
         
-        # Find connected components
-        connected_components = list(nx.connected_components(undirected))
+        # Find connected components, ignoring edge direction (the same as the
+        # components of the undirected graph, without building a copy of it)
+        connected_components = list(nx.weakly_connected_components(graph))
         
         # Count orphaned nodes (nodes with no connections)
-        orphaned_nodes = [node for node in self.G.nodes() 
-                        if self.G.in_degree(node) == 0 and self.G.out_degree(node) == 0]
+        orphaned_nodes = [node for node, degree in graph.degree() if degree == 0]
         
         # Categorize components by size
         component_sizes = [len(comp) for comp in connected_components]
         
         # Get the largest connected component (main graph)
         largest_component_size = max(component_sizes) if component_sizes else 0
-        largest_component_percentage = (largest_component_size / len(self.G.nodes())) * 100 if self.G.nodes() else 0
+        node_count = graph.number_of_nodes()
+        largest_component_percentage = (largest_component_size / node_count) * 100 if node_count else 0
         
         return {
             "connected_components": len(connected_components),
@@ -1748,12 +1947,27 @@ class LineageGraphGenerator:
             nx.write_graphml(self.G, filename)
         elif format == "json":
             filename = os.path.join(self.output_dir, f"lineage_graph_{timestamp}.json")
-            data = {
-                "nodes": [{"id": node, **self.G.nodes[node]} for node in self.G.nodes()],
-                "edges": [{"source": u, "target": v, **self.G.edges[u, v]} for u, v in self.G.edges()]
-            }
+            # Write one record at a time rather than building the whole document
+            # in memory first; the output matches json.dump of the full dict
+            graph = self.G
+            dumps = json.dumps
             with open(filename, 'w') as f:
-                json.dump(data, f)
+                f.write('{"nodes": [')
+                sep = ""
+                for node, attrs in graph.nodes(data=True):
+                    f.write(sep + dumps({"id": node, **attrs}))
+                    sep = ", "
+                f.write('], "edges": [')
+                sep = ""
+                for u, v, attrs in graph.edges(data=True):
+                    f.write(sep + dumps({"source": u, "target": v, **attrs}))
+                    sep = ", "
+                f.write(']}')
+        elif format == "pickle":
+            # Fastest to write and load back; GEXF/GraphML are for other tools
+            filename = os.path.join(self.output_dir, f"lineage_graph_{timestamp}.pickle")
+            with open(filename, 'wb') as f:
+                pickle.dump(self.G, f, protocol=pickle.HIGHEST_PROTOCOL)
         else:
             raise ValueError(f"Unsupported output format: {format}")
         
@@ -1762,89 +1976,112 @@ class LineageGraphGenerator:
 
     def get_graph_stats(self):
         """Get statistics about the generated graph"""
+        graph = self.G
+        node_attrs = [attrs for _, attrs in graph.nodes(data=True)]
+        
         # Count nodes by type
-        node_types = defaultdict(int)
-        for node in self.G.nodes():
-            node_type = self.G.nodes[node].get("type", "unknown")
-            node_types[node_type] += 1
+        node_types = Counter(attrs.get("type", "unknown") for attrs in node_attrs)
         
         # Count edges by relationship type
-        edge_types = defaultdict(int)
-        for u, v in self.G.edges():
-            rel_type = self.G.edges[u, v].get("relationship", "unknown")
-            edge_types[rel_type] += 1
+        edge_types = Counter(rel_type for _, _, rel_type in graph.edges(data="relationship", default="unknown"))
         
         # Count nodes by team
-        team_nodes = defaultdict(int)
-        for node in self.G.nodes():
-            team = self.G.nodes[node].get("team", "unknown")
-            team_nodes[team] += 1
+        team_nodes = Counter(attrs.get("team", "unknown") for attrs in node_attrs)
         
         # Count nodes by data source
-        ds_nodes = defaultdict(int)
-        for node in self.G.nodes():
-            ds = self.G.nodes[node].get("data_source", "unknown")
-            ds_nodes[ds] += 1
-            
-        # Count nodes by popularity score range
-        popularity_ranges = {
-            "heavy_usage (70-100)": 0,
-            "moderate_usage (40-69)": 0,
-            "light_usage (1-39)": 0,
-            "no_usage (-1)": 0
-        }
-        
-        for node in self.G.nodes():
-            score = self.G.nodes[node].get("score", -1)
-            if score >= 70:
-                popularity_ranges["heavy_usage (70-100)"] += 1
-            elif score >= 40:
-                popularity_ranges["moderate_usage (40-69)"] += 1
-            elif score >= 1:
-                popularity_ranges["light_usage (1-39)"] += 1
-            else:
-                popularity_ranges["no_usage (-1)"] += 1
-        
-        # Get connectivity stats
-        connectivity_stats = self._analyze_connectivity()
+        ds_nodes = Counter(attrs.get("data_source", "unknown") for attrs in node_attrs)
         
         return {
-            "total_nodes": len(self.G.nodes()),
-            "total_edges": len(self.G.edges()),
-            "node_types": dict(node_types),
-            "edge_types": dict(edge_types),
-            "team_nodes": dict(team_nodes),
-            "data_source_nodes": dict(ds_nodes)
+            "total_nodes": graph.number_of_nodes(),
+            "total_edges": graph.number_of_edges(),
+            "node_types": node_types,
+            "edge_types": edge_types,
+            "team_nodes": team_nodes,
+            "data_source_nodes": ds_nodes
         }
 
+    def _adjacency_matrix(self, graph, nodes):
+        """Build a sparse adjacency matrix of the graph, with rows in node list order"""
+        node_count = len(nodes)
+        index = {n: i for i, n in enumerate(nodes)}
+        
+        edge_count = graph.number_of_edges()
+        sources = np.fromiter((index[u] for u, _ in graph.edges()), dtype=np.int64, count=edge_count)
+        targets = np.fromiter((index[v] for _, v in graph.edges()), dtype=np.int64, count=edge_count)
+        return csr_matrix((np.ones(edge_count, dtype=np.int8), (sources, targets)),
+                          shape=(node_count, node_count))
+    
+    def _average_shortest_path_length(self, adjacency):
+        """Get the average shortest path length of a strongly connected graph's adjacency matrix"""
+        node_count = adjacency.shape[0]
+        if node_count == 1:
+            return 0
+        
+        # BFS from a block of sources at a time, keeping the distance rows
+        # to about 16M entries rather than the full n x n matrix
+        batch_size = max(1, (1 << 24) // node_count)
+        total = 0
+        for start in range(0, node_count, batch_size):
+            sources = np.arange(start, min(start + batch_size, node_count))
+            total += int(shortest_path(adjacency, directed=True, unweighted=True, indices=sources).sum())
+        return total / (node_count * (node_count - 1))
+    
+    def _strongly_connected_components(self, nodes, component_count, labels):
+        """Group node ids into sets by their strongly connected component labels"""
+        components = [set() for _ in range(component_count)]
+        for node, label in zip(nodes, labels.tolist()):
+            components[label].add(node)
+        return components
+    
     def analyze_graph(self):
         """Perform additional analysis on the graph"""
         results = {}
         
-        # Calculate degree centrality
-        results["degree_centrality"] = nx.degree_centrality(self.G)
+        graph = self.G
         
-        # Calculate in-degree and out-degree centrality
-        results["in_degree_centrality"] = nx.in_degree_centrality(self.G)
-        results["out_degree_centrality"] = nx.out_degree_centrality(self.G)
+        # Build the sparse adjacency matrix once; the degrees, components and
+        # largest component below are all read from it
+        nodes = list(graph)
+        node_count = len(nodes)
+        adjacency = self._adjacency_matrix(graph, nodes)
+        
+        # Read in- and out-degrees off the matrix and derive all three degree
+        # centralities from them (the same values as nx.degree_centrality and friends)
+        in_degrees = np.bincount(adjacency.indices, minlength=node_count)
+        out_degrees = np.diff(adjacency.indptr)
+        
+        if node_count <= 1:
+            # NetworkX defines a lone node's centrality as 1
+            for key in ("degree_centrality", "in_degree_centrality", "out_degree_centrality"):
+                results[key] = {n: 1 for n in nodes}
+        else:
+            scale = 1.0 / (node_count - 1)
+            results["degree_centrality"] = dict(zip(nodes, ((in_degrees + out_degrees) * scale).tolist()))
+            results["in_degree_centrality"] = dict(zip(nodes, (in_degrees * scale).tolist()))
+            results["out_degree_centrality"] = dict(zip(nodes, (out_degrees * scale).tolist()))
         
         # Find sources (no incoming edges) and sinks (no outgoing edges)
-        results["sources"] = [n for n in self.G.nodes() if self.G.in_degree(n) == 0]
-        results["sinks"] = [n for n in self.G.nodes() if self.G.out_degree(n) == 0]
-        
-        # Find strongly connected components
-        results["strongly_connected_components"] = list(nx.strongly_connected_components(self.G))
-        
-        # Calculate average path length for the largest connected component
-        undirected = self.G.to_undirected()
-        connected_components = list(nx.connected_components(undirected))
-        if connected_components:
-            largest_component = max(connected_components, key=len)
-            largest_component_subgraph = self.G.subgraph(largest_component).copy()
-            
-            try:
-                results["average_path_length"] = nx.average_shortest_path_length(largest_component_subgraph)
-            except:
+        results["sources"] = [nodes[i] for i in np.flatnonzero(in_degrees == 0).tolist()]
+        results["sinks"] = [nodes[i] for i in np.flatnonzero(out_degrees == 0).tolist()]
+        
+        # Find strongly connected components on the adjacency matrix, which
+        # runs in compiled code instead of NetworkX's Python DFS
+        strong_count, strong_labels = connected_components(adjacency, directed=True, connection="strong")
+        results["strongly_connected_components"] = self._strongly_connected_components(nodes, strong_count, strong_labels)
+        
+        # Calculate average path length for the largest connected component,
+        # labelling weak components on the same matrix instead of building an
+        # undirected copy of the graph
+        if node_count:
+            _, labels = connected_components(adjacency, directed=True, connection="weak")
+            largest_label = np.argmax(np.bincount(labels))
+            idx = np.flatnonzero(labels == largest_label)
+            
+            # Path lengths are only defined if the component is also strongly
+            # connected, which the strong labels above already tell us
+            if (strong_labels[idx] == strong_labels[idx[0]]).all():
+                results["average_path_length"] = self._average_shortest_path_length(adjacency[idx][:, idx])
+            else:
                 results["average_path_length"] = "Not applicable (not strongly connected)"
         else:
             results["average_path_length"] = "Not applicable (no connected components)"